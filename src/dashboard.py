@@ -1,19 +1,72 @@
-import dash
-from dash import dcc, html
-from dash.dependencies import Input, Output
-import plotly.graph_objs as go
-import plotly.express as px
-import pandas as pd
 import sqlite3
+import sys
 import numpy as np
 import logging
-from src.tda_engine import TDAEngine
 
 # Configure Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("DASHBOARD")
 
-def run_dashboard_server():
+# The dashboard only reads; the trading core owns the writes (WAL mode lets both run concurrently)
+_DB_URI = 'file:market_data.db?mode=ro'
+# Served by idx_ticks_sym_ts as an index range read (newest first)
+_QUERY = "SELECT timestamp, price, volume, symbol FROM ticks WHERE symbol = ? ORDER BY timestamp DESC LIMIT 500"
+# Cheap change check: a single index lookup
+_LAST_TS_QUERY = "SELECT MAX(timestamp) FROM ticks WHERE symbol = ?"
+_CONN = None
+
+# Placeholder TDA surface: per-column decay profile and its RNG
+_DECAY = np.exp(-0.1 * np.arange(20))
+_RNG = np.random.default_rng()
+
+def _get_conn() -> sqlite3.Connection:
+    """Returns the process-wide read-only connection, opening it on first use."""
+    global _CONN
+    if _CONN is None:
+        conn = sqlite3.connect(_DB_URI, uri=True, check_same_thread=False)
+        conn.execute("PRAGMA query_only=1")
+        _CONN = conn
+    return _CONN
+
+def _bollinger_bands(prices: np.ndarray, window: int = 20, k: float = 2.0):
+    """
+    Rolling mean +/- k * rolling sample std (same as pandas rolling) from two cumsum passes.
+    The first `window - 1` entries are NaN.
+    """
+    upper = np.full(len(prices), np.nan)
+    lower = np.full(len(prices), np.nan)
+    if len(prices) < window:
+        return upper, lower
+
+    # Shift by the first price so the sum-of-squares stays small (less cancellation)
+    x = prices - prices[0]
+    c1 = np.cumsum(np.insert(x, 0, 0.0))
+    c2 = np.cumsum(np.insert(x * x, 0, 0.0))
+    s1 = c1[window:] - c1[:-window]
+    s2 = c2[window:] - c2[:-window]
+
+    mean = s1 / window
+    std = np.sqrt(np.maximum((s2 - s1 * mean) / (window - 1), 0.0))
+    mean += prices[0]
+
+    upper[window - 1:] = mean + k * std
+    lower[window - 1:] = mean - k * std
+    return upper, lower
+
+def run_dashboard_server(symbol="BBRI"):
+    # Dash, Plotly and pandas are only needed in the dashboard process; importing them here
+    # keeps them out of the trading core, which imports this module to spawn the server.
+    import dash
+    from dash import Patch, dcc, html, no_update
+    from dash.dependencies import Input, Output, State
+    from dash.exceptions import PreventUpdate
+    import plotly.graph_objs as go
+    import plotly.io as pio
+    import pandas as pd
+
+    # Dash encodes callback responses through plotly.io.json; use the orjson backend
+    pio.json.config.default_engine = "orjson"
+
     app = dash.Dash(__name__, external_stylesheets=['https://codepen.io/chriddyp/pen/bWLwgP.css'])
 
     # Dark Mode / Cyberpunk Theme
@@ -23,22 +76,80 @@ def run_dashboard_server():
         'grid': '#333333'
     }
 
+    # Figures are built once with empty traces; the callback only patches their data arrays
+    # --- Chart 1: Monte Carlo Cloud (Price + Bands) ---
+    fig_mc = go.Figure()
+
+    # Real Price
+    fig_mc.add_trace(go.Scatter(
+        x=[], y=[],
+        mode='lines', name='Price',
+        line=dict(color='#00F0FF', width=2)
+    ))
+
+    # Bollinger Bands approximation for visual effect (Simulating MC Cone)
+    fig_mc.add_trace(go.Scatter(
+        x=[], y=[],
+        mode='lines', line=dict(width=0),
+        showlegend=False
+    ))
+    fig_mc.add_trace(go.Scatter(
+        x=[], y=[],
+        mode='lines', line=dict(width=0),
+        fill='tonexty', fillcolor='rgba(0, 255, 65, 0.1)',
+        name='Confidence Interval'
+    ))
+
+    fig_mc.update_layout(
+        title='MONTE CARLO PROBABILITY CLOUD',
+        paper_bgcolor=colors['background'],
+        plot_bgcolor=colors['background'],
+        font={'color': colors['text']},
+        xaxis=dict(showgrid=False, type='date'),
+        yaxis=dict(gridcolor=colors['grid'])
+    )
+
+    # --- Chart 2: TDA Persistence Landscape (3D) ---
+    fig_tda = go.Figure(data=[go.Surface(z=[[]], colorscale='Viridis')])
+    fig_tda.update_layout(
+        title='TOPOLOGICAL PERSISTENCE LANDSCAPE',
+        paper_bgcolor=colors['background'],
+        plot_bgcolor=colors['background'],
+        font={'color': colors['text']},
+        scene = dict(
+            xaxis = dict(title='Time', backgroundcolor=colors['background'], gridcolor=colors['grid']),
+            yaxis = dict(title='Filtration', backgroundcolor=colors['background'], gridcolor=colors['grid']),
+            zaxis = dict(title='Norm', backgroundcolor=colors['background'], gridcolor=colors['grid']),
+        )
+    )
+
+    # --- Chart 3: Order Book Heatmap ---
+    fig_heat = go.Figure(data=[go.Heatmap(z=[[]], colorscale='Hot', colorbar=dict(title='volume'))])
+    fig_heat.update_layout(
+        title='LIQUIDITY HEATMAP (BUY WALLS)',
+        paper_bgcolor=colors['background'],
+        plot_bgcolor=colors['background'],
+        font={'color': colors['text']},
+        xaxis=dict(showgrid=False, type='date'),
+        yaxis=dict(gridcolor=colors['grid'])
+    )
+
     app.layout = html.Div(style={'backgroundColor': colors['background'], 'color': colors['text'], 'padding': '20px'}, children=[
         html.H1("IDX HYBRID ALGO // VISUAL ALPHA", style={'textAlign': 'center', 'fontFamily': 'Courier New'}),
 
         # Top Row: Price & MC Cloud
         html.Div([
-            dcc.Graph(id='mc-cloud-chart', style={'height': '45vh'}),
+            dcc.Graph(id='mc-cloud-chart', figure=fig_mc, style={'height': '45vh'}),
         ], style={'marginBottom': '20px'}),
 
         # Bottom Row: TDA & Order Book
         html.Div([
             html.Div([
-                dcc.Graph(id='tda-landscape-chart')
+                dcc.Graph(id='tda-landscape-chart', figure=fig_tda)
             ], style={'width': '49%', 'display': 'inline-block'}),
 
             html.Div([
-                dcc.Graph(id='heatmap-chart')
+                dcc.Graph(id='heatmap-chart', figure=fig_heat)
             ], style={'width': '49%', 'display': 'inline-block', 'float': 'right'}),
         ]),
 
@@ -46,123 +157,86 @@ def run_dashboard_server():
             id='interval-component',
             interval=2000, # 2s update
             n_intervals=0
-        )
+        ),
+
+        # Timestamp of the newest tick this client has rendered
+        dcc.Store(id='last-tick-ts')
     ])
 
     @app.callback(
         [Output('mc-cloud-chart', 'figure'),
          Output('tda-landscape-chart', 'figure'),
-         Output('heatmap-chart', 'figure')],
-        [Input('interval-component', 'n_intervals')]
+         Output('heatmap-chart', 'figure'),
+         Output('last-tick-ts', 'data')],
+        [Input('interval-component', 'n_intervals')],
+        [State('last-tick-ts', 'data')]
     )
-    def update_charts(n):
-        conn = None
+    def update_charts(n, last_ts):
         try:
-            conn = sqlite3.connect('market_data.db')
-            df = pd.read_sql_query("SELECT * FROM ticks ORDER BY timestamp DESC LIMIT 500", conn)
+            # Skip the full refresh when no tick has landed since the last render
+            conn = _get_conn()
+            newest_ts = conn.execute(_LAST_TS_QUERY, (symbol,)).fetchone()[0]
+            if newest_ts is None or newest_ts == last_ts:
+                raise PreventUpdate
 
-            if df.empty:
-                empty_fig = go.Figure()
-                empty_fig.update_layout(paper_bgcolor=colors['background'], plot_bgcolor=colors['background'])
-                return empty_fig, empty_fig, empty_fig
+            df = pd.read_sql_query(_QUERY, conn, params=(symbol,))
 
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
-            df = df.sort_values('timestamp')
+            # Rows arrive newest-first from the index; reverse the view instead of re-sorting
+            df = df.iloc[::-1]
+            epoch = df['timestamp'].to_numpy()
+            # Plotly date axes take epoch milliseconds directly; no datetime64 conversion needed
+            epoch_ms = (epoch * 1000).astype(np.int64)
 
             # --- Chart 1: Monte Carlo Cloud (Price + Bands) ---
-            fig_mc = go.Figure()
-
-            # Real Price
-            fig_mc.add_trace(go.Scatter(
-                x=df['timestamp'], y=df['price'],
-                mode='lines', name='Price',
-                line=dict(color='#00F0FF', width=2)
-            ))
-
-            # Bollinger Bands approximation for visual effect (Simulating MC Cone)
-            rolling_mean = df['price'].rolling(window=20).mean()
-            rolling_std = df['price'].rolling(window=20).std()
-            upper = rolling_mean + (rolling_std * 2)
-            lower = rolling_mean - (rolling_std * 2)
-
-            fig_mc.add_trace(go.Scatter(
-                x=df['timestamp'], y=upper,
-                mode='lines', line=dict(width=0),
-                showlegend=False
-            ))
-            fig_mc.add_trace(go.Scatter(
-                x=df['timestamp'], y=lower,
-                mode='lines', line=dict(width=0),
-                fill='tonexty', fillcolor='rgba(0, 255, 65, 0.1)',
-                name='Confidence Interval'
-            ))
-
-            fig_mc.update_layout(
-                title='MONTE CARLO PROBABILITY CLOUD',
-                paper_bgcolor=colors['background'],
-                plot_bgcolor=colors['background'],
-                font={'color': colors['text']},
-                xaxis=dict(showgrid=False),
-                yaxis=dict(gridcolor=colors['grid'])
-            )
+            price = df['price'].to_numpy(dtype=np.float64)
+            upper, lower = _bollinger_bands(price)
+
+            # Trace data is sent as float32: plenty for display, and shorter to encode
+            patch_mc = Patch()
+            for i, y in enumerate((price, upper, lower)):
+                patch_mc['data'][i]['x'] = epoch_ms
+                patch_mc['data'][i]['y'] = y.astype(np.float32)
 
             # --- Chart 2: TDA Persistence Landscape (3D) ---
             # Simulating 3D data: Time vs Filtration vs Intensity
             # In reality, this would come from TDAEngine. Here we create a visual placeholder based on Volatility
 
             # Create a 3D surface representing "Turbulence"
-            z_data = []
-            for i in range(len(df)):
-                # Mock landscape: Function of price vol
-                vol = np.random.normal(10, 2) if i % 50 == 0 else np.random.normal(2, 0.5)
-                z_row = [vol * np.exp(-0.1*x) for x in range(20)] # Decay
-                z_data.append(z_row)
-
-            z_data = np.array(z_data).T # Transpose for surface
-
-            fig_tda = go.Figure(data=[go.Surface(z=z_data, colorscale='Viridis')])
-            fig_tda.update_layout(
-                title='TOPOLOGICAL PERSISTENCE LANDSCAPE',
-                paper_bgcolor=colors['background'],
-                plot_bgcolor=colors['background'],
-                font={'color': colors['text']},
-                scene = dict(
-                    xaxis = dict(title='Time', backgroundcolor=colors['background'], gridcolor=colors['grid']),
-                    yaxis = dict(title='Filtration', backgroundcolor=colors['background'], gridcolor=colors['grid']),
-                    zaxis = dict(title='Norm', backgroundcolor=colors['background'], gridcolor=colors['grid']),
-                )
-            )
+            # Mock landscape: Function of price vol, spiking every 50 ticks
+            n_rows = len(df)
+            spikes = np.arange(n_rows) % 50 == 0
+            vols = np.where(spikes, _RNG.normal(10, 2, n_rows), _RNG.normal(2, 0.5, n_rows))
+            z_data = np.outer(_DECAY, vols) # (filtration, time) for surface
 
-            # --- Chart 3: Order Book Heatmap ---
-            # Visualizing "Volume" intensity at price levels
-            # We use a 2D Histogram/Density Heatmap
+            patch_tda = Patch()
+            patch_tda['data'][0]['z'] = z_data.astype(np.float32)
 
-            fig_heat = px.density_heatmap(
-                df, x='timestamp', y='price', z='volume',
-                nbinsx=30, nbinsy=20,
-                color_continuous_scale='Hot'
+            # --- Chart 3: Order Book Heatmap ---
+            # Visualizing "Volume" intensity at price levels: volume summed per (time, price) bin
+            hist, t_edges, p_edges = np.histogram2d(
+                epoch, df['price'].to_numpy(),
+                bins=(30, 20), weights=df['volume'].to_numpy()
             )
 
-            fig_heat.update_layout(
-                title='LIQUIDITY HEATMAP (BUY WALLS)',
-                paper_bgcolor=colors['background'],
-                plot_bgcolor=colors['background'],
-                font={'color': colors['text']},
-                xaxis=dict(showgrid=False),
-                yaxis=dict(gridcolor=colors['grid'])
-            )
+            patch_heat = Patch()
+            patch_heat['data'][0]['x'] = ((t_edges[:-1] + t_edges[1:]) * 500).astype(np.int64) # bin centres, ms
+            patch_heat['data'][0]['y'] = ((p_edges[:-1] + p_edges[1:]) / 2).astype(np.float32)
+            patch_heat['data'][0]['z'] = hist.T.astype(np.float32) # Heatmap rows are price bins
 
-            return fig_mc, fig_tda, fig_heat
+            return patch_mc, patch_tda, patch_heat, newest_ts
 
+        except PreventUpdate:
+            raise
         except Exception as e:
             logger.error(f"Dashboard Update Failed: {e}")
-            return go.Figure(), go.Figure(), go.Figure()
-        finally:
-            if conn:
-                conn.close()
+            return no_update, no_update, no_update, no_update
 
     logger.info("Visual Alpha Dashboard Live on port 8050")
     app.run(debug=False, host='0.0.0.0', port=8050)
 
 if __name__ == "__main__":
-    run_dashboard_server()
+    # Usage: python -m src.dashboard [SYMBOL]
+    if len(sys.argv) > 1:
+        run_dashboard_server(sys.argv[1])
+    else:
+        run_dashboard_server()
@@ -1,12 +1,24 @@
 import asyncio
-import random
+import math
+import struct
 import time
+from bisect import bisect_left
 from dataclasses import dataclass
 import numpy as np
 
-@dataclass
+# IDX tick-size fractions: prices above each threshold trade in the next size up.
+# Plain tuples: bisect on a scalar is ~20x cheaper than a NumPy searchsorted call.
+_TICK_THRESHOLDS = (200, 500, 2000, 5000)
+_TICK_SIZES = (1, 2, 5, 10, 25)
+
+# Random draws are generated in chunks to amortize NumPy dispatch over many ticks
+_RNG_CHUNK = 4096
+
+# GBM time step (using small time steps for HFT-like simulation)
+_DT = 1.0 / (252 * 390 * 60) # Approx 1 second
+
+@dataclass(slots=True)
 class Tick:
-    __slots__ = ['symbol', 'price', 'volume', 'timestamp', 'bid_vol', 'ask_vol']
     symbol: str
     price: float
     volume: int
@@ -14,6 +26,75 @@ class Tick:
     bid_vol: int
     ask_vol: int
 
+# Wire format for streaming ticks between processes: fixed header, then the UTF-8 symbol
+# (price, volume, timestamp, bid_vol, ask_vol, symbol_len)
+_TICK_HEADER = struct.Struct('<dqdqqB')
+
+def encode_tick(tick: Tick) -> bytes:
+    symbol = tick.symbol.encode('utf-8')
+    return _TICK_HEADER.pack(
+        tick.price, tick.volume, tick.timestamp, tick.bid_vol, tick.ask_vol, len(symbol)
+    ) + symbol
+
+async def read_tick(reader: asyncio.StreamReader) -> Tick:
+    """Reads one encode_tick() frame. Raises asyncio.IncompleteReadError at end of stream."""
+    price, volume, timestamp, bid_vol, ask_vol, symbol_len = _TICK_HEADER.unpack(
+        await reader.readexactly(_TICK_HEADER.size)
+    )
+    symbol = (await reader.readexactly(symbol_len)).decode('utf-8')
+    return Tick(symbol, price, volume, timestamp, bid_vol, ask_vol)
+
+class TickBuffer:
+    """
+    Struct-of-arrays tick storage: one preallocated NumPy column per Tick field,
+    filled in place up to `n`. Symbols are interned to small integer ids.
+    """
+    __slots__ = ['capacity', 'n', 'symbols', '_symbol_ids',
+                 'symbol_idx', 'price', 'volume', 'timestamp', 'bid_vol', 'ask_vol']
+
+    def __init__(self, capacity=10_000):
+        self.capacity = capacity
+        self.n = 0
+        self.symbols: list[str] = []
+        self._symbol_ids: dict[str, int] = {}
+
+        self.symbol_idx = np.empty(capacity, dtype=np.int32)
+        self.price = np.empty(capacity, dtype=np.float64)
+        self.volume = np.empty(capacity, dtype=np.int64)
+        self.timestamp = np.empty(capacity, dtype=np.float64)
+        self.bid_vol = np.empty(capacity, dtype=np.int64)
+        self.ask_vol = np.empty(capacity, dtype=np.int64)
+
+    def symbol_id(self, symbol: str) -> int:
+        sid = self._symbol_ids.get(symbol)
+        if sid is None:
+            sid = self._symbol_ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return sid
+
+    def reserve(self, k: int) -> tuple[int, int]:
+        """Claims the next k slots and returns their [start, end) range."""
+        start = self.n
+        end = start + k
+        if end > self.capacity:
+            raise ValueError(f"TickBuffer full ({self.n}/{self.capacity}), cannot add {k} ticks")
+        self.n = end
+        return start, end
+
+    def clear(self):
+        self.n = 0
+
+    def rows(self, start: int, end: int, fields) -> zip:
+        """Row tuples for [start, end) with columns in the given Tick field order."""
+        columns = []
+        for field in fields:
+            if field == 'symbol':
+                symbols = self.symbols
+                columns.append([symbols[i] for i in self.symbol_idx[start:end].tolist()])
+            else:
+                columns.append(getattr(self, field)[start:end].tolist())
+        return zip(*columns)
+
 class DataSource:
     async def connect(self):
         raise NotImplementedError
@@ -21,6 +102,16 @@ class DataSource:
     async def get_tick(self) -> Tick:
         raise NotImplementedError
 
+    async def get_ticks(self, n: int) -> list[Tick]:
+        """Returns up to n ticks. Sources that can produce bursts should override this."""
+        ticks = []
+        for _ in range(n):
+            tick = await self.get_tick()
+            if tick is None:
+                break
+            ticks.append(tick)
+        return ticks
+
 class MockIDXSource(DataSource):
     def __init__(self, symbol="BBRI.JK", start_price=4800, mu=0.0001, sigma=0.02):
         self.symbol = symbol
@@ -29,60 +120,105 @@ class MockIDXSource(DataSource):
         self.sigma = sigma
         self.running = False
 
+        self._rng = np.random.default_rng()
+        self._buf_i = self._buf_n = _RNG_CHUNK
+
     async def connect(self):
         self.running = True
         print(f"Connected to Mock IDX Source for {self.symbol}")
 
+    def _refill(self):
+        """
+        Pre-computes the next chunk of per-tick draws (as Python scalars).
+        The GBM + jump step is evaluated for the whole chunk at once, leaving
+        a single multiply per tick in get_tick.
+        """
+        rng = self._rng
+        n = self._buf_n
+
+        # Simulate GBM step
+        drift = (self.mu - 0.5 * self.sigma**2) * _DT
+        diffusion = self.sigma * math.sqrt(_DT) * rng.standard_normal(n)
+
+        # Jump diffusion (occasional shock to test TDA): flash crash / pump
+        jump_u = rng.random(n)
+        jump = np.where(jump_u < 0.0005, -0.05, np.where(jump_u > 0.9995, 0.05, 0.0))
+
+        self._growth = np.exp(drift + diffusion + jump).tolist()
+        self._bid = rng.integers(100, 5001, n).tolist()
+        self._ask = rng.integers(100, 5001, n).tolist()
+        self._vol_u = rng.random(n).tolist()
+        self._vol_sz = rng.integers(1, 101, n).tolist()
+        self._buf_i = 0
+
     async def get_tick(self) -> Tick:
         if not self.running:
             await asyncio.sleep(0.1)
             return None
 
-        # Simulate GBM step (using small time steps for HFT-like simulation)
-        dt = 1.0 / (252 * 390 * 60) # Approx 1 second
-        drift = (self.mu - 0.5 * self.sigma**2) * dt
-        diffusion = self.sigma * np.sqrt(dt) * np.random.normal()
+        tick = self._next_tick()
 
-        # Jump diffusion (occasional shock to test TDA)
-        jump = 0
-        rand_val = random.random()
-        if rand_val < 0.0005: # Flash crash
-            jump = -0.05
-        elif rand_val > 0.9995: # Pump
-            jump = 0.05
-
-        ret = drift + diffusion + jump
-        self.price *= np.exp(ret)
+        # Simulate slight latency
+        await asyncio.sleep(0.001)
 
-        # Quantize to tick size (IDX rules)
-        if self.price > 5000:
-            tick_size = 25
-        elif self.price > 2000:
-            tick_size = 10
-        elif self.price > 500:
-            tick_size = 5
-        elif self.price > 200:
-            tick_size = 2
-        else:
-            tick_size = 1
+        return tick
 
-        self.price = max(50, round(self.price / tick_size) * tick_size)
+    async def get_ticks(self, n: int) -> list[Tick]:
+        """Produces n ticks per scheduling quantum, yielding to the loop once at the end."""
+        if not self.running:
+            await asyncio.sleep(0.1)
+            return []
 
-        # Simulate Order Book volumes
-        bid_vol = random.randint(100, 5000)
-        ask_vol = random.randint(100, 5000)
+        ticks = [self._next_tick() for _ in range(n)]
+        await asyncio.sleep(0)
+        return ticks
 
-        # Simulate trade volume
-        volume = random.randint(1, 100) if random.random() > 0.7 else 0
+    def generate_batch(self, buf: TickBuffer, k: int) -> tuple[int, int]:
+        """Appends k ticks to `buf` column-wise; returns the [start, end) range written."""
+        if k == 0:
+            return buf.n, buf.n
+        start, end = buf.reserve(k)
+        price, volume, timestamp, bid_vol, ask_vol = zip(*[self._step() for _ in range(k)])
 
-        # Simulate slight latency
-        await asyncio.sleep(0.001)
+        buf.symbol_idx[start:end] = buf.symbol_id(self.symbol)
+        buf.price[start:end] = price
+        buf.volume[start:end] = volume
+        buf.timestamp[start:end] = timestamp
+        buf.bid_vol[start:end] = bid_vol
+        buf.ask_vol[start:end] = ask_vol
+        return start, end
 
+    def _next_tick(self) -> Tick:
+        price, volume, timestamp, bid_vol, ask_vol = self._step()
         return Tick(
             symbol=self.symbol,
-            price=self.price,
+            price=price,
             volume=volume,
-            timestamp=time.time(),
+            timestamp=timestamp,
             bid_vol=bid_vol,
             ask_vol=ask_vol
         )
+
+    def _step(self) -> tuple:
+        """Advances the simulation one tick: (price, volume, timestamp, bid_vol, ask_vol)."""
+        if self._buf_i >= self._buf_n:
+            self._refill()
+        i = self._buf_i
+        self._buf_i = i + 1
+
+        # GBM + jump step, pre-computed in _refill
+        self.price *= self._growth[i]
+
+        # Quantize to tick size (IDX rules)
+        tick_size = _TICK_SIZES[bisect_left(_TICK_THRESHOLDS, self.price)]
+
+        self.price = max(50, round(self.price / tick_size) * tick_size)
+
+        # Simulate Order Book volumes
+        bid_vol = self._bid[i]
+        ask_vol = self._ask[i]
+
+        # Simulate trade volume
+        volume = self._vol_sz[i] if self._vol_u[i] > 0.7 else 0
+
+        return self.price, volume, time.time(), bid_vol, ask_vol
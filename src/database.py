@@ -1,10 +1,24 @@
 import asyncio
+import logging
 import sqlite3
 import aiosqlite
 from typing import List
-from src.data_ingestion import Tick
+from itertools import starmap
+from src.data_ingestion import Tick, TickBuffer
+
+logger = logging.getLogger("DB")
+
+# Write batching: ticks are buffered in memory and flushed with a single
+# executemany() + commit() every BATCH_SIZE ticks or FLUSH_MS milliseconds,
+# whichever comes first.
+BATCH_SIZE = 100
+FLUSH_MS = 50
 
 class DatabaseAdapter:
+    # Subclasses define the INSERT statement, its column order and how a Tick maps onto its parameters
+    INSERT_SQL = None
+    COLUMNS = ()
+
     async def connect(self):
         raise NotImplementedError
     async def write_tick(self, tick: Tick):
@@ -12,13 +26,93 @@ class DatabaseAdapter:
     async def query_history(self, symbol: str, limit: int) -> List[Tick]:
         raise NotImplementedError
 
+    def _tick_row(self, tick: Tick) -> tuple:
+        raise NotImplementedError
+
+    async def _configure_connection(self):
+        """WAL + synchronous=NORMAL keeps the batched commits cheap."""
+        await self.conn.execute("PRAGMA journal_mode=WAL")
+        await self.conn.execute("PRAGMA synchronous=NORMAL")
+
+    def _start_flusher(self):
+        """Sets up the write buffer and the background flush task (once per adapter)."""
+        if getattr(self, "_flush_task", None) is not None:
+            return
+        self._buf: list[tuple] = []
+        self._flush_event = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._stopping = False
+        self._flush_task = asyncio.create_task(self._flusher())
+
+    async def _flusher(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), FLUSH_MS / 1000)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            await self.flush()
+
+    def _buffer_tick(self, tick: Tick):
+        self._buf.append(self._tick_row(tick))
+        if len(self._buf) >= BATCH_SIZE:
+            self._flush_event.set()
+
+    async def write_many(self, ticks: List[Tick]):
+        """Buffers a batch of ticks; the background flusher commits them."""
+        if not self.conn:
+            await self.connect()
+
+        self._buf.extend(map(self._tick_row, ticks))
+        if len(self._buf) >= BATCH_SIZE:
+            self._flush_event.set()
+
+    async def write_batch(self, buf: TickBuffer, start: int, end: int):
+        """Buffers ticks [start, end) of a TickBuffer straight from its columns."""
+        if not self.conn:
+            await self.connect()
+
+        self._buf.extend(buf.rows(start, end, self.COLUMNS))
+        if len(self._buf) >= BATCH_SIZE:
+            self._flush_event.set()
+
+    async def flush(self):
+        """Writes all buffered ticks in one transaction."""
+        async with self._flush_lock:
+            if not self._buf:
+                return
+            batch, self._buf = self._buf, []
+            try:
+                await self.conn.executemany(self.INSERT_SQL, batch)
+                await self.conn.commit()
+            except Exception as e:
+                logger.error(f"Batch Write Error ({len(batch)} ticks): {e}")
+
+    async def close(self):
+        """Stops the flush task, writes any pending ticks and closes the connection."""
+        if getattr(self, "_flush_task", None) is not None:
+            # Stop cooperatively rather than cancelling: a batch the flusher has already
+            # swapped out of the buffer is committed before the task exits
+            self._stopping = True
+            self._flush_event.set()
+            await self._flush_task
+            self._flush_task = None
+            await self.flush()
+        if self.conn:
+            await self.conn.close()
+            self.conn = None
+
 class MockDatabase(DatabaseAdapter):
+    INSERT_SQL = 'INSERT INTO ticks (timestamp, symbol, price, volume, bid_vol, ask_vol) VALUES (?, ?, ?, ?, ?, ?)'
+    COLUMNS = ('timestamp', 'symbol', 'price', 'volume', 'bid_vol', 'ask_vol')
+
     def __init__(self, db_path="market_data.db"):
         self.db_path = db_path
         self.conn = None
 
     async def connect(self):
         self.conn = await aiosqlite.connect(self.db_path)
+        await self._configure_connection()
         await self.conn.execute('''
             CREATE TABLE IF NOT EXISTS ticks (
                 timestamp REAL,
@@ -29,42 +123,37 @@ class MockDatabase(DatabaseAdapter):
                 ask_vol INTEGER
             )
         ''')
+        await self.conn.execute('CREATE INDEX IF NOT EXISTS idx_ticks_sym_ts ON ticks(symbol, timestamp DESC)')
         await self.conn.commit()
+        self._start_flusher()
         print(f"Connected to Mock Database (SQLite) at {self.db_path}")
 
+    def _tick_row(self, tick: Tick) -> tuple:
+        return (tick.timestamp, tick.symbol, tick.price, tick.volume, tick.bid_vol, tick.ask_vol)
+
     async def write_tick(self, tick: Tick):
         if not self.conn:
             await self.connect()
 
-        await self.conn.execute(
-            'INSERT INTO ticks (timestamp, symbol, price, volume, bid_vol, ask_vol) VALUES (?, ?, ?, ?, ?, ?)',
-            (tick.timestamp, tick.symbol, tick.price, tick.volume, tick.bid_vol, tick.ask_vol)
-        )
-        await self.conn.commit()
+        self._buffer_tick(tick)
 
     async def query_history(self, symbol: str, limit: int) -> List[Tick]:
         if not self.conn:
             await self.connect()
 
+        # Make buffered ticks visible to the read
+        await self.flush()
+
         cursor = await self.conn.execute(
             'SELECT symbol, price, volume, timestamp, bid_vol, ask_vol FROM ticks WHERE symbol = ? ORDER BY timestamp DESC LIMIT ?',
             (symbol, limit)
         )
         rows = await cursor.fetchall()
         # Sort back to ascending time
-        rows = rows[::-1]
-
-        ticks = [
-            Tick(
-                symbol=row[0],
-                price=row[1],
-                volume=row[2],
-                timestamp=row[3],
-                bid_vol=row[4],
-                ask_vol=row[5]
-            ) for row in rows
-        ]
-        return ticks
+        rows.reverse()
+
+        # Columns are selected in Tick field order
+        return list(starmap(Tick, rows))
 
     # Synchronous method for Dashboard (Dash runs in sync context usually, but can use async)
     # Ideally Dash should use its own connection.
@@ -1,11 +1,15 @@
 import aiosqlite
 import logging
+from itertools import starmap
 from src.data_ingestion import Tick
 from src.database import DatabaseAdapter
 
 logger = logging.getLogger("DB_SQLITE")
 
 class SQLiteAdapter(DatabaseAdapter):
+    INSERT_SQL = "INSERT INTO ticks (symbol, price, volume, bid_vol, ask_vol, timestamp) VALUES (?, ?, ?, ?, ?, ?)"
+    COLUMNS = ('symbol', 'price', 'volume', 'bid_vol', 'ask_vol', 'timestamp')
+
     def __init__(self, db_path="market_data.db"):
         self.db_path = db_path
         self.conn = None
@@ -13,6 +17,7 @@ class SQLiteAdapter(DatabaseAdapter):
     async def connect(self):
         """Initialize the DB schema"""
         self.conn = await aiosqlite.connect(self.db_path)
+        await self._configure_connection()
         await self.conn.execute('''
             CREATE TABLE IF NOT EXISTS ticks (
                 symbol TEXT,
@@ -23,20 +28,21 @@ class SQLiteAdapter(DatabaseAdapter):
                 timestamp REAL
             )
         ''')
+        await self.conn.execute('CREATE INDEX IF NOT EXISTS idx_ticks_sym_ts ON ticks(symbol, timestamp DESC)')
         await self.conn.commit()
+        self._start_flusher()
         logger.info(f"Connected to SQLite: {self.db_path}")
 
+    def _tick_row(self, tick: Tick) -> tuple:
+        return (tick.symbol, tick.price, tick.volume, tick.bid_vol, tick.ask_vol, tick.timestamp)
+
     async def write_tick(self, tick: Tick):
-        """Writes a single tick to the DB"""
+        """Buffers a single tick; the background flusher commits it in a batch"""
         try:
             if not self.conn:
                 await self.connect()
 
-            await self.conn.execute(
-                "INSERT INTO ticks (symbol, price, volume, bid_vol, ask_vol, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
-                (tick.symbol, tick.price, tick.volume, tick.bid_vol, tick.ask_vol, tick.timestamp)
-            )
-            await self.conn.commit()
+            self._buffer_tick(tick)
         except Exception as e:
             logger.error(f"Write Error: {e}")
 
@@ -44,22 +50,16 @@ class SQLiteAdapter(DatabaseAdapter):
         if not self.conn:
             await self.connect()
 
+        # Make buffered ticks visible to the read
+        await self.flush()
+
         cursor = await self.conn.execute(
-            'SELECT symbol, price, volume, bid_vol, ask_vol, timestamp FROM ticks WHERE symbol = ? ORDER BY timestamp DESC LIMIT ?',
+            'SELECT symbol, price, volume, timestamp, bid_vol, ask_vol FROM ticks WHERE symbol = ? ORDER BY timestamp DESC LIMIT ?',
             (symbol, limit)
         )
         rows = await cursor.fetchall()
         # Sort back to ascending time for strategy processing
-        rows = rows[::-1]
+        rows.reverse()
 
-        ticks = [
-            Tick(
-                symbol=row[0],
-                price=row[1],
-                volume=row[2],
-                bid_vol=row[3],
-                ask_vol=row[4],
-                timestamp=row[5]
-            ) for row in rows
-        ]
-        return ticks
+        # Columns are selected in Tick field order
+        return list(starmap(Tick, rows))
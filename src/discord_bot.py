@@ -4,6 +4,10 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Discord rejects messages longer than this
+MAX_MESSAGE_LENGTH = 2000
+SIGNAL_SEPARATOR = "\n---\n"
+
 class DiscordNotifier:
     def __init__(self, token=None, channel_id=None):
         self.token = token
@@ -11,6 +15,10 @@ class DiscordNotifier:
         # We mock the client if no token provided
         self.client = discord.Client(intents=discord.Intents.default()) if token else None
 
+        # Outbound signals; drained by _sender_loop so the tick path never waits on Discord
+        self._q = asyncio.Queue()
+        self._sender_task = None
+
     async def start(self):
         if self.token:
             asyncio.create_task(self.client.start(self.token))
@@ -18,13 +26,54 @@ class DiscordNotifier:
         else:
             logger.info("Discord Bot running in MOCK mode (No Token)")
 
+        if self._sender_task is None:
+            self._sender_task = asyncio.create_task(self._sender_loop())
+
     async def send_signal(self, signal: dict):
-        message = f"🚨 **SIGNAL ALERT** 🚨\n" \
-                  f"**Action**: {signal['action']}\n" \
-                  f"**Symbol**: {signal['symbol']}\n" \
-                  f"**Price**: {signal['price']}\n" \
-                  f"**Reason**: {signal['reason']}"
+        """Queues the signal for delivery. Never awaits Discord."""
+        self._q.put_nowait(signal)
+
+    @staticmethod
+    def _format_signal(signal: dict) -> str:
+        return f"🚨 **SIGNAL ALERT** 🚨\n" \
+               f"**Action**: {signal['action']}\n" \
+               f"**Symbol**: {signal['symbol']}\n" \
+               f"**Price**: {signal['price']}\n" \
+               f"**Reason**: {signal['reason']}"
+
+    @staticmethod
+    def _coalesce(messages: list[str]) -> list[str]:
+        """Joins messages into as few Discord-sized posts as possible."""
+        posts = []
+        current = ""
+        for msg in messages:
+            candidate = f"{current}{SIGNAL_SEPARATOR}{msg}" if current else msg
+            if current and len(candidate) > MAX_MESSAGE_LENGTH:
+                posts.append(current)
+                current = msg
+            else:
+                current = candidate
+        if current:
+            posts.append(current)
+        return posts
+
+    async def _sender_loop(self):
+        while True:
+            # Wait for one signal, then take whatever else piled up meanwhile
+            batch = [await self._q.get()]
+            while True:
+                try:
+                    batch.append(self._q.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            for message in self._coalesce([self._format_signal(s) for s in batch]):
+                try:
+                    await self._deliver(message)
+                except Exception as e:
+                    logger.error(f"Discord send failed: {e}")
 
+    async def _deliver(self, message: str):
         logger.info(f"Sending Notification: {message}")
 
         if self.client and self.client.is_ready():
@@ -2,10 +2,12 @@ import asyncio
 import uvloop
 import logging
 import multiprocessing
+import os
+import tempfile
 import time
-from multiprocessing import Queue
+from functools import partial
 
-from src.scrapers.stockbit import StockbitLiveSource
+from src.data_ingestion import encode_tick, read_tick
 from src.database_sqlite import SQLiteAdapter
 from src.tda_engine import TDAEngine
 from src.mc_engine import MonteCarloEngine
@@ -20,87 +22,144 @@ logging.basicConfig(
 )
 logger = logging.getLogger("IDX_ALGO")
 
-async def trading_core(tick_queue: Queue):
+# Max ticks drained from the tick queue per event-loop pass
+TICK_BATCH_SIZE = 64
+
+# The scraper process streams ticks to the trading core over this AF_UNIX socket
+SCRAPER_SOCKET = os.path.join(tempfile.gettempdir(), "idx_screener_ticks.sock")
+SYMBOL = "BBRI"
+
+async def receive_ticks(tick_queue: asyncio.Queue, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Socket handler: decodes tick frames from the scraper process into the tick queue."""
+    logger.info("Scraper connected.")
+    try:
+        while True:
+            tick_queue.put_nowait(await read_tick(reader))
+    except asyncio.IncompleteReadError:
+        logger.warning("Scraper disconnected.")
+    finally:
+        writer.close()
+
+async def trading_core():
     """The HFT Logic Loop (Runs on CPU Core 1)"""
-    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     logger.info("Initializing HFT Engine...")
 
     # 1. Initialize Components
     db = SQLiteAdapter()
     await db.connect()
 
-    # Switch to StockbitLiveSource
-    # Note: Headless=True by default. Set False for debugging/login.
-    data_source = StockbitLiveSource(symbol="BBRI", headless=True)
-    data_source.queue = tick_queue # Inject Queue for real-time passing
-
-    tda = TDAEngine(window_size=50)
-    mc = MonteCarloEngine(simulations=500, horizon=5)
-    notifier = DiscordNotifier(token=None)
-    strategy = HybridStrategy(tda_engine=tda, mc_engine=mc)
-
-    # Pre-fill Strategy with DB history
-    await db.connect()
-    history = await db.query_history("BBRI", 50)
-    if history:
-        strategy.load_initial_data([t.price for t in history])
-
-    # 2. Start Services
-    # Connect DataSource (This launches Playwright)
-    # Ideally, we run data_source.connect() as a task because it blocks on while loop
-
-    await notifier.start()
-
-    logger.info("HFT Engine Live. Launching Scraper...")
-
-    # Create background task for scraper
-    scraper_task = asyncio.create_task(data_source.connect())
-
+    # Ctrl+C reaches this coroutine as a CancelledError under uvloop.run, so the cleanup
+    # lives in a finally: close() commits the ticks still held by the batched flusher
+    server = None
     try:
-        while True:
-            # We consume from the Queue populated by the Scraper
-            # Check queue non-blocking
-            while not tick_queue.empty():
-                tick = tick_queue.get()
-
-                if tick:
-                    # 1. Persist (IO Bound)
-                    await db.write_tick(tick)
-
-                    # 2. Analyze & Execute (CPU Bound)
+        # Ticks arrive from the scraper process over the unix socket and are queued here
+        tick_queue = asyncio.Queue()
+
+        tda = TDAEngine(window_size=50)
+        mc = MonteCarloEngine(simulations=500, horizon=5)
+        notifier = DiscordNotifier(token=None)
+        strategy = HybridStrategy(tda_engine=tda, mc_engine=mc)
+
+        # Pre-fill Strategy with DB history
+        history = await db.query_history(SYMBOL, 50)
+        if history:
+            strategy.load_initial_data([t.price for t in history])
+
+        # 2. Start Services
+        await notifier.start()
+
+        # The scraper process (Playwright) connects to this socket and streams ticks
+        # (a socket file left behind by a previous run would make the bind fail)
+        if os.path.exists(SCRAPER_SOCKET):
+            os.unlink(SCRAPER_SOCKET)
+        server = await asyncio.start_unix_server(partial(receive_ticks, tick_queue), path=SCRAPER_SOCKET)
+
+        logger.info("HFT Engine Live. Waiting for Scraper...")
+
+        try:
+            while True:
+                # We consume from the Queue populated by the Scraper:
+                # wait for the next tick, then drain whatever else is already queued
+                ticks = [await tick_queue.get()]
+                while len(ticks) < TICK_BATCH_SIZE:
+                    try:
+                        ticks.append(tick_queue.get_nowait())
+                    except asyncio.QueueEmpty:
+                        break
+
+                # 1. Persist (IO Bound) - one buffered write per batch
+                await db.write_many(ticks)
+
+                # 2. Analyze & Execute (CPU Bound)
+                for tick in ticks:
                     signal = await strategy.on_tick(tick)
 
                     if signal:
                         logger.info(f"⚡ ACTION: {signal['action']} | {signal['reason']}")
                         await notifier.send_signal(signal)
 
-            # Zero-sleep yield
-            await asyncio.sleep(0.01)
+        except KeyboardInterrupt:
+            logger.info("HFT Engine Stopping...")
+        except Exception as e:
+            logger.error(f"Core Error: {e}")
+    finally:
+        if server is not None:
+            server.close()
+        await db.close()
+
+async def scraper_main(socket_path: str):
+    """Runs StockbitLiveSource and forwards its ticks to the trading core."""
+    # Playwright is only imported in the scraper process
+    from src.scrapers.stockbit import StockbitLiveSource
+
+    # The trading core may still be starting up; retry until its socket accepts
+    while True:
+        try:
+            reader, writer = await asyncio.open_unix_connection(socket_path)
+            break
+        except (FileNotFoundError, ConnectionRefusedError):
+            await asyncio.sleep(0.5)
 
-    except KeyboardInterrupt:
-        logger.info("HFT Engine Stopping...")
+    # Note: Headless=True by default. Set False for debugging/login.
+    data_source = StockbitLiveSource(symbol=SYMBOL, headless=True)
+    tick_queue = asyncio.Queue()
+    data_source.queue = tick_queue # Inject Queue for real-time passing
+
+    # Connect DataSource (This launches Playwright)
+    scraper_task = asyncio.create_task(data_source.connect())
+    try:
+        while True:
+            writer.write(encode_tick(await tick_queue.get()))
+            while not tick_queue.empty():
+                writer.write(encode_tick(tick_queue.get_nowait()))
+            await writer.drain()
+    finally:
         scraper_task.cancel()
-    except Exception as e:
-        logger.error(f"Core Error: {e}")
+        writer.close()
+
+def start_scraper():
+    """The Browser Scraper (Runs on its own CPU core, isolated from the trading loop)"""
+    uvloop.run(scraper_main(SCRAPER_SOCKET))
 
 def start_dashboard():
     """The Visual Server (Runs on CPU Core 2)"""
-    # Dash reads from SQLite directly, so we don't need to pass the queue here
+    # Dash reads from SQLite directly, so we don't need the tick queue here
     # unless we wanted to implement a live update via websocket/server-sent-events
     # For now, polling DB is robust.
-    run_dashboard_server()
+    run_dashboard_server(SYMBOL)
 
 if __name__ == "__main__":
-    # IPC Queue
-    tick_queue = multiprocessing.Queue()
-
     p1 = multiprocessing.Process(target=start_dashboard, name="Dashboard_Proc")
     p1.start()
 
+    p2 = multiprocessing.Process(target=start_scraper, name="Scraper_Proc")
+    p2.start()
+
     try:
-        # Run the Async Trading Bot in the Main Process
-        asyncio.run(trading_core(tick_queue))
+        # Run the Async Trading Bot in the Main Process, on a uvloop event loop
+        uvloop.run(trading_core())
     except KeyboardInterrupt:
         logger.info("Main Process Shutdown.")
-        p1.terminate()
-        p1.join()
+        for p in (p2, p1):
+            p.terminate()
+            p.join()
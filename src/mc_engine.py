@@ -1,7 +1,9 @@
 import numpy as np
-import scipy.stats as stats
 from dataclasses import dataclass
 
+# Largest finite float32; simulated prices are kept below it
+_F32_MAX = float(np.finfo(np.float32).max)
+
 @dataclass
 class SimulationResult:
     median_path: np.ndarray
@@ -9,12 +11,42 @@ class SimulationResult:
     upper_bound: np.ndarray # 95th percentile
     ruin_probability: float
 
+def _quantiles(a: np.ndarray, qs, axis=0) -> list[np.ndarray]:
+    """
+    Linear-interpolated quantiles along `axis` (same values as np.percentile / np.median)
+    from a single np.partition call: O(n) selection instead of one full sort per quantile.
+    """
+    n = a.shape[axis]
+    positions = [q * (n - 1) for q in qs]
+    kth = sorted({int(np.floor(p)) for p in positions} | {int(np.ceil(p)) for p in positions})
+    part = np.partition(a, kth, axis=axis)
+
+    out = []
+    for p in positions:
+        lo, hi = int(np.floor(p)), int(np.ceil(p))
+        v_lo = np.take(part, lo, axis=axis)
+        if hi == lo:
+            out.append(v_lo)
+        else:
+            v_hi = np.take(part, hi, axis=axis)
+            out.append(v_lo + (v_hi - v_lo) * (p - lo))
+    return out
+
 class MonteCarloEngine:
     def __init__(self, simulations=1000, horizon=5, dt=1/252):
         self.simulations = simulations
         self.horizon = horizon
         self.dt = dt
 
+        # PCG64 generator and draw buffers, reused across calls to avoid per-call allocation.
+        # Paths are simulated in float32: ample for quantile/probability outputs, half the bandwidth.
+        self._rng = np.random.default_rng()
+        # Time-major layout (steps, simulations): each time step is one contiguous row, so the
+        # per-step quantile/ruin reductions read memory sequentially.
+        self._Z = np.empty((horizon, simulations), dtype=np.float32)
+        self._U = np.empty((horizon, simulations), dtype=np.float32)
+        self._jumps = np.empty((horizon, simulations), dtype=bool)
+
     def simulate_paths(self, start_price: float, mu: float, sigma: float) -> SimulationResult:
         """
         Simulates future price paths using Geometric Brownian Motion with Jump Diffusion.
@@ -23,56 +55,64 @@ class MonteCarloEngine:
         steps = self.horizon
 
         # 1. Generate Returns Components
-        # Random normal shocks for GBM
-        # shape: (simulations, steps)
-        Z = np.random.normal(0, 1, (self.simulations, steps))
+        # Random normal shocks for GBM, drawn into the preallocated buffer
+        # shape: (steps, simulations)
+        Z = self._Z
+        self._rng.standard_normal(dtype=np.float32, out=Z)
 
         # Drift component (constant per step)
         drift = (mu - 0.5 * sigma**2) * self.dt
 
-        # Diffusion component
-        diffusion = sigma * np.sqrt(self.dt) * Z
+        # Diffusion + drift, in place: Z becomes the log-return array
+        Z *= np.float32(sigma * np.sqrt(self.dt))
+        Z += np.float32(drift)
+        log_returns = Z
 
         # Jump Diffusion
         # Lambda = 0.01 (1% chance of jump per step)
         jump_prob = 0.01
-        # Random choice for jumps: 1 if jump, 0 if not
-        jumps = np.random.choice([0, 1], size=(self.simulations, steps), p=[1-jump_prob, jump_prob])
-        # Jump magnitude
-        jump_magnitude = np.random.normal(-0.1, 0.05, (self.simulations, steps)) # Bearish skew
-
-        jump_impact = jumps * jump_magnitude
-
-        # Total Log Returns
-        log_returns = drift + diffusion + jump_impact
+        self._rng.random(dtype=np.float32, out=self._U)
+        jumps = np.less(self._U, jump_prob, out=self._jumps)
+        # Jump magnitude ~ N(-0.1, 0.05), drawn in float32 only where a jump happened
+        jump_size = self._rng.standard_normal(np.count_nonzero(jumps), dtype=np.float32)
+        jump_size *= np.float32(0.05)
+        jump_size += np.float32(-0.1) # Bearish skew
+        log_returns[jumps] += jump_size
 
         # 2. Convert to Price Paths
         # Cumulative sum of log returns -> Cumulative product of exponential returns
-        cum_log_returns = np.cumsum(log_returns, axis=1)
-        price_paths = start_price * np.exp(cum_log_returns)
-
-        # Prepend start_price to each path for t=0
-        # shape becomes (simulations, steps + 1)
-        price_paths = np.hstack([np.full((self.simulations, 1), start_price), price_paths])
+        start = np.float32(start_price)
+        # Row 0 holds start_price for t=0
+        # shape: (steps + 1, simulations)
+        price_paths = np.empty((steps + 1, self.simulations), dtype=np.float32)
+        price_paths[0] = start
+        # Computed in place in the final array: no cumsum/exp/scale temporaries
+        future = price_paths[1:]
+        np.cumsum(log_returns, axis=0, out=future)
+        # float32 overflows far sooner than float64 (exp above ~88), and an inf/NaN path turns
+        # the quantile bands into NaN: cap the cumulative log-return so the scaled price stays
+        # below half the float32 max, and flatten NaN (non-finite mu/sigma) to a zero return
+        log_cap = np.float32(np.log(_F32_MAX / (2.0 * start_price)))
+        np.nan_to_num(future, copy=False, nan=0.0, posinf=log_cap)
+        np.minimum(future, log_cap, out=future)
+        np.exp(future, out=future)
+        future *= start
 
         # 3. Apply Constraints (ARB)
         # Vectorized ARB check is tricky because it's path dependent (if t hits ARB, does it stick?)
         # For simplicity in vectorized form, we just cap the price at the limit.
         # Ideally, ARB lock means liquidity dries up, but for price simulation:
-        arb_limit = start_price * 0.65
-        price_paths = np.maximum(price_paths, arb_limit)
+        arb_limit = np.float32(start_price * 0.65)
+        np.maximum(price_paths, arb_limit, out=price_paths)
 
         # 4. Calculate Statistics
-        median_path = np.median(price_paths, axis=0)
-        lower_bound = np.percentile(price_paths, 5, axis=0)
-        upper_bound = np.percentile(price_paths, 95, axis=0)
+        lower_bound, median_path, upper_bound = _quantiles(price_paths, (0.05, 0.5, 0.95), axis=1)
 
         # Ruin: hitting ARB or Stop Loss (say 5% down)
-        stop_loss = start_price * 0.95
-        # Check if any point in the path dropped below stop loss
-        # axis=1 checks across time steps for each simulation
-        ruin_counts = np.sum(np.any(price_paths < stop_loss, axis=1))
-        ruin_prob = ruin_counts / self.simulations
+        stop_loss = np.float32(start_price * 0.95)
+        # A path is ruined if its minimum over time (axis=0) dropped below stop loss:
+        # one min-reduction row, no full boolean (steps + 1, simulations) temporary
+        ruin_prob = np.count_nonzero(price_paths.min(axis=0) < stop_loss) / self.simulations
 
         return SimulationResult(median_path, lower_bound, upper_bound, ruin_prob)
 
@@ -3,26 +3,41 @@ import json
 import logging
 import os
 import time
-import re
 from dataclasses import asdict
 from typing import Optional, List
 
+import orjson
 from playwright.async_api import async_playwright, Page, BrowserContext
 from fake_useragent import UserAgent
 
 from src.data_ingestion import DataSource, Tick
 
 logger = logging.getLogger("STOCKBIT_SCRAPER")
-JSON_BRACKET_PATTERN = re.compile(r'[\[{]')
+JSON_OPENERS = ('{', '[', b'{', b'[')
 LOG_PREVIEW_LENGTH = 100
 
+# Parsing the bundled user-agent database is slow; do it once per process, not per connect()
+_UA = UserAgent()
+
+def _json_start(payload) -> int:
+    """Index of the first '[' or '{' in a str/bytes frame, or -1. Plain C-level finds, no regex."""
+    if isinstance(payload, bytes):
+        bracket, brace = payload.find(b'['), payload.find(b'{')
+    else:
+        bracket, brace = payload.find('['), payload.find('{')
+    if bracket < 0:
+        return brace
+    if brace < 0:
+        return bracket
+    return min(bracket, brace)
+
 class StockbitLiveSource(DataSource):
     def __init__(self, symbol="BBRI", headless=True):
         self.symbol = symbol
         self.headless = headless
         self.browser_context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
-        self.queue = None  # To be set by main.py
+        self.queue = None  # asyncio.Queue, to be set by main.py
         self.running = False
         self.cookies_path = "stockbit_cookies.json"
 
@@ -31,8 +46,7 @@ class StockbitLiveSource(DataSource):
         logger.info(f"Connecting to Stockbit for {self.symbol}...")
         self.running = True
 
-        ua = UserAgent()
-        user_agent = ua.random
+        user_agent = _UA.random
 
         async with async_playwright() as p:
             # Launch with Stealth Args
@@ -106,24 +120,23 @@ class StockbitLiveSource(DataSource):
     def on_frame(self, frame):
         payload = None
         try:
+            # Kept as delivered (str or bytes): orjson parses both, so no UTF-8 decode is needed
             payload = frame.payload
-            if isinstance(payload, bytes):
-                payload = payload.decode('utf-8')
 
             # --- HANDLE SOCKET.IO PREFIX (The Fix) ---
             # Stockbit sends '42["trade",...]' which isn't valid JSON until stripped
-            if not (payload.startswith('{') or payload.startswith('[')):
+            if payload[:1] not in JSON_OPENERS:
                 # Look for the first JSON bracket
-                match = JSON_BRACKET_PATTERN.search(payload)
-                if match:
-                    payload = payload[match.start():]
+                start = _json_start(payload)
+                if start >= 0:
+                    payload = payload[start:]
                 else:
                     if logger.isEnabledFor(logging.DEBUG):
                         preview = payload[:LOG_PREVIEW_LENGTH]
                         logger.debug("Dropping non-JSON frame: %s", preview)
                     return
 
-            data = json.loads(payload)
+            data = orjson.loads(payload)
 
             # Handle list format: ["event_name", {data}]
             if isinstance(data, list) and len(data) > 1:
@@ -135,7 +148,7 @@ class StockbitLiveSource(DataSource):
 
         except Exception as e:
             if logger.isEnabledFor(logging.DEBUG):
-                preview = payload[:LOG_PREVIEW_LENGTH] if isinstance(payload, str) else payload
+                preview = payload[:LOG_PREVIEW_LENGTH] if isinstance(payload, (str, bytes)) else payload
                 logger.debug(
                     "Frame parse failed for payload preview %s: %s",
                     preview,
@@ -165,7 +178,7 @@ class StockbitLiveSource(DataSource):
                 )
 
                 if self.queue:
-                    self.queue.put(tick)
+                    self.queue.put_nowait(tick)
                     # logger.info(f"Tick enqueued: {price}")
 
         except Exception as e:
@@ -1,5 +1,10 @@
 import asyncio
+import functools
 import logging
+import math
+import time
+from collections import deque
+from itertools import islice
 import numpy as np
 from src.data_ingestion import Tick
 from src.tda_engine import TDAEngine
@@ -7,12 +12,31 @@ from src.mc_engine import MonteCarloEngine
 
 logger = logging.getLogger(__name__)
 
+PRICE_HISTORY = 200
+RETURN_WINDOW = 20 # Returns used for the short-term mu/sigma estimate
+TDA_EVERY_N_TICKS = 10
+ANNUALIZATION = 252 * 390 * 60
+MC_MIN_INTERVAL = 0.25 # Seconds between Monte Carlo runs; reuse the last levels in between
+MC_CACHE_SIZE = 256
+
 class HybridStrategy:
     def __init__(self, tda_engine: TDAEngine, mc_engine: MonteCarloEngine):
         self.tda_engine = tda_engine
         self.mc_engine = mc_engine
 
-        self.prices = []
+        self.prices = deque(maxlen=PRICE_HISTORY)
+        self._tick_count = 0
+
+        # Rolling sums over the last RETURN_WINDOW simple returns (O(1) mu/sigma per tick)
+        self._returns = deque(maxlen=RETURN_WINDOW)
+        self._ret_sum = 0.0
+        self._ret_sumsq = 0.0
+
+        # Monte Carlo levels: (buy_zone, ruin_probability), cached per quantized (price, mu, sigma)
+        self._mc_levels = functools.lru_cache(maxsize=MC_CACHE_SIZE)(self._simulate_levels)
+        self._last_mc_time = float("-inf")
+        self._last_mc_levels = None
+
         self.regime = "NEUTRAL"
         self.current_position = 0
 
@@ -24,23 +48,62 @@ class HybridStrategy:
         """
         Pre-fill the price history to avoid warm-up delay.
         """
-        self.prices = prices
+        self.prices = deque(prices, maxlen=PRICE_HISTORY)
+        self._returns.clear()
+        self._ret_sum = 0.0
+        self._ret_sumsq = 0.0
+        recent = prices[-(RETURN_WINDOW + 1):]
+        for prev, new in zip(recent, recent[1:]):
+            self._push_return((new - prev) / prev)
         logger.info(f"Strategy initialized with {len(prices)} historical data points.")
 
+    def _push_return(self, r: float):
+        if len(self._returns) == RETURN_WINDOW:
+            old = self._returns[0]
+            self._ret_sum -= old
+            self._ret_sumsq -= old * old
+        self._returns.append(r)
+        self._ret_sum += r
+        self._ret_sumsq += r * r
+
+    def _simulate_levels(self, start_price: float, mu: float, sigma: float) -> tuple[float, float]:
+        mc_res = self.mc_engine.simulate_paths(start_price, mu, sigma)
+        # Buy Zone: Below lower bound (Mean Reversion)
+        buy_zone = float(mc_res.lower_bound[1]) # Next step lower bound
+        return buy_zone, float(mc_res.ruin_probability)
+
+    def _monte_carlo_levels(self, price: float, mu: float, sigma: float) -> tuple[float, float]:
+        """
+        Returns (buy_zone, ruin_probability). Within MC_MIN_INTERVAL of the last run the
+        previous levels are reused; otherwise inputs are quantized and looked up in the cache.
+        """
+        now = time.monotonic()
+        if self._last_mc_levels is not None and now - self._last_mc_time < MC_MIN_INTERVAL:
+            return self._last_mc_levels
+
+        self._last_mc_levels = self._mc_levels(round(price, 2), round(mu, 4), round(sigma, 4))
+        self._last_mc_time = now
+        return self._last_mc_levels
+
     async def on_tick(self, tick: Tick) -> dict:
         """
         Process a new tick. Returns a Signal dict if action required, else None.
         """
+        if self.prices:
+            prev = self.prices[-1]
+            self._push_return((tick.price - prev) / prev)
         self.prices.append(tick.price)
-        if len(self.prices) > 200:
-            self.prices.pop(0)
+        self._tick_count += 1
 
         signal = None
 
         # 1. Macro: Regime Detection (TDA)
-        # We don't run TDA on every tick, maybe every 50 ticks
-        if len(self.prices) >= self.tda_engine.window_size and len(self.prices) % 10 == 0:
-            l1_norm = await self.tda_engine.compute_landscape_norm(self.prices)
+        # We don't run TDA on every tick, only every TDA_EVERY_N_TICKS ticks
+        if len(self.prices) >= self.tda_engine.window_size and self._tick_count % TDA_EVERY_N_TICKS == 0:
+            # Hand over only the TDA window, read straight from the deque into one array
+            window = self.tda_engine.window_size
+            recent = np.fromiter(islice(self.prices, len(self.prices) - window, None), dtype=np.float64, count=window)
+            l1_norm = await self.tda_engine.compute_landscape_norm(recent)
             logger.info(f"TDA L1 Norm: {l1_norm:.2f}")
 
             prev_regime = self.regime
@@ -58,16 +121,14 @@ class HybridStrategy:
         if self.regime == "STABLE_TREND" and len(self.prices) > 22:
             # Check Monte Carlo levels
             # Estimate short term vol
-            price_window = np.array(self.prices[-21:]) # Take last 21 prices
-            returns = np.diff(price_window) / price_window[:-1] # Returns length 20
-
-            sigma = np.std(returns) * np.sqrt(252*390*60) # Annualized
-            mu = np.mean(returns) * 252*390*60
+            # Mean / population std of the last RETURN_WINDOW returns, from the rolling sums
+            mean = self._ret_sum / RETURN_WINDOW
+            var = max(self._ret_sumsq / RETURN_WINDOW - mean * mean, 0.0)
 
-            mc_res = self.mc_engine.simulate_paths(tick.price, mu, sigma)
+            sigma = math.sqrt(var) * math.sqrt(ANNUALIZATION) # Annualized
+            mu = mean * ANNUALIZATION
 
-            # Buy Zone: Below lower bound (Mean Reversion)
-            buy_zone = mc_res.lower_bound[1] # Next step lower bound
+            buy_zone, ruin_probability = self._monte_carlo_levels(tick.price, mu, sigma)
 
             # Order Book Imbalance
             total_vol = tick.bid_vol + tick.ask_vol
@@ -78,7 +139,7 @@ class HybridStrategy:
 
             if tick.price <= buy_zone and obi > 0.3:
                 # Calculate Size
-                win_prob = 1.0 - mc_res.ruin_probability
+                win_prob = 1.0 - ruin_probability
                 kelly = self.mc_engine.calculate_kelly_fraction(win_prob, 2.0, 1.0) # 2:1 Reward/Risk assumed
 
                 if kelly > 0:
@@ -1,42 +1,163 @@
 import numpy as np
-from gtda.time_series import TakensEmbedding
-from gtda.homology import VietorisRipsPersistence
-from gtda.diagrams import PersistenceLandscape
+from gph import ripser_parallel
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import functools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Windows that compute faster than this run directly on the event loop: the executor hop
+# (pickling, IPC to a worker process, future callback) would cost a large share of the work itself
+INLINE_MAX_SECONDS = 0.002
+NORM_CACHE_SIZE = 256 # Recent windows whose norm is memoized (a repeated window skips the pipeline)
+# The regime thresholds were set against the sum of a 100-bin rasterized landscape. That sum is the
+# landscape integral divided by the bin step, (max death - min birth) / (LANDSCAPE_BINS - 1), so
+# the exact integral is reported on that same scale.
+LANDSCAPE_BINS = 100
+_BAR_RTOL = 1e-5
+
+def _landscape_l1(dgm: np.ndarray) -> float:
+    """
+    L1 norm of the first persistence landscape of one (birth, death) diagram, integrated exactly
+    and reported on the LANDSCAPE_BINS sample-sum scale.
+    The landscape is the upper envelope of one tent per bar, of area (death - birth)^2 / 4.
+    Bars nested in another add nothing to it; the rest, sorted by birth, also have increasing
+    deaths, and only consecutive tents overlap, by a tent of area (d_k - b_k+1)^2 / 4.
+    """
+    dgm = dgm[np.isfinite(dgm[:, 1])]
+    if not len(dgm):
+        return 0.0
+    # Bars shorter than float32 rounding of the distances are noise; they would only move the span
+    dgm = dgm[dgm[:, 1] - dgm[:, 0] > _BAR_RTOL * np.abs(dgm[:, 1]).max()]
+    if not len(dgm):
+        return 0.0
+    span = float(dgm[:, 1].max() - dgm[:, 0].min())
+
+    order = np.lexsort((-dgm[:, 1], dgm[:, 0]))
+    births, deaths = dgm[order, 0], dgm[order, 1]
+    # A bar is nested if an earlier-born one dies at or after it
+    outer = np.empty(len(deaths), dtype=bool)
+    outer[0] = True
+    outer[1:] = deaths[1:] > np.maximum.accumulate(deaths)[:-1]
+    births, deaths = births[outer], deaths[outer]
+
+    overlaps = np.maximum(deaths[:-1] - births[1:], 0.0)
+    integral = 0.25 * float(np.sum((deaths - births) ** 2) - np.sum(overlaps ** 2))
+    return integral * (LANDSCAPE_BINS - 1) / span
+
+def _h0_landscape_l1(D: np.ndarray) -> float:
+    """
+    H0-only landscape L1 norm straight from the distance matrix. Every H0 bar of a Rips
+    filtration is born at 0 and dies at a minimum spanning tree edge, so the bars are nested
+    and the first landscape is the tent of the longest, L: its integral is L^2 / 4 over a span of L,
+    i.e. (LANDSCAPE_BINS - 1) * L / 4 on the bin-sum scale of _landscape_l1.
+    Prim's algorithm, one vectorized row update per vertex; no persistence computation.
+    """
+    # Columns of vertices already in the tree are masked to inf (on a copy)
+    D = D.copy()
+    D[:, 0] = np.inf
+    dist = D[0].copy()
+    longest = 0.0
+    for _ in range(len(D) - 1):
+        j = dist.argmin()
+        longest = max(longest, float(dist[j]))
+        D[:, j] = np.inf
+        dist[j] = np.inf
+        np.minimum(dist, D[j], out=dist)
+    return 0.25 * (LANDSCAPE_BINS - 1) * longest
+
+def _distance_matrix(points: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Euclidean distance matrix from ||a||^2 + ||b||^2 - 2 a.b: one BLAS matmul and in-place
+    passes, no (n, n, dim) difference temporary. Points are centered first (distances are
+    translation invariant) so the identity does not cancel price-sized squares.
+    """
+    points = points - points.mean(axis=0)
+    sq = np.einsum('ij,ij->i', points, points)
+    D = np.matmul(points, points.T, out=out)
+    D *= -2
+    D += sq[:, np.newaxis]
+    D += sq
+    np.maximum(D, 0, out=D)
+    np.sqrt(D, out=D)
+    # ripser reads the diagonal as vertex birth times: keep it exactly zero
+    np.fill_diagonal(D, 0.0)
+    return D
+
+# Per-process engine of a ProcessPoolExecutor worker, built by _init_worker
+_worker_engine = None
+
+def _init_worker(cpu_cores, engine_kwargs: dict):
+    """Worker initializer: pin the process to its cores and build the worker's own engine."""
+    global _worker_engine
+    if cpu_cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpu_cores)
+    _worker_engine = TDAEngine(**engine_kwargs, max_workers=0)
+
+def _worker_norm(key: bytes) -> float:
+    # Runs in the worker: its engine keeps its own rolling state and cache across calls
+    return _worker_engine._cached_norm(key)
+
 class TDAEngine:
-    def __init__(self, window_size=50, embedding_dimension=3, time_delay=1):
+    def __init__(self, window_size=50, embedding_dimension=3, time_delay=1, max_workers=1, n_threads=-1,
+                 normalize=False, h0_only=False, cpu_cores=None):
         self.window_size = window_size
         self.embedding_dimension = embedding_dimension
         self.time_delay = time_delay
+        # Report the norm of the z-normalized window, comparable across price levels/symbols
+        self.normalize = normalize
 
-        # Initialize TDA transformers
-        # flatten=False ensures we get (n_samples, n_points, dimension)
-        self.embedder = TakensEmbedding(
-            time_delay=self.time_delay,
-            dimension=self.embedding_dimension,
-            flatten=False
-        )
+        # Homology dimensions 0 (connected components) and 1 (loops).
+        # h0_only computes components alone, from a minimum spanning tree instead of ripser.
+        self.max_homology_dim = 0 if h0_only else 1
+        # Threads for ripser's boundary-matrix reduction (-1: all cores). Lower it when
+        # max_workers > 1 or cpu_cores is set so concurrent windows do not oversubscribe the cores.
+        self.n_threads = n_threads
 
-        # Homology dimensions 0 (connected components) and 1 (loops)
-        self.persistence = VietorisRipsPersistence(
-            homology_dimensions=[0, 1],
-            n_jobs=1
-        )
+        # Rolling state for streaming windows: the last window, its Takens points in a ring
+        # buffer (oldest at _head) and their distance matrix. A window that only advanced by
+        # k samples recomputes just the k new points' distances: O(k n) instead of O(n^2).
+        # Buffers are allocated once and overwritten in place; _rolling marks them as valid.
+        n_points = window_size - (embedding_dimension - 1) * time_delay
+        self._last_window = np.empty(window_size, dtype=np.float32)
+        self._points = np.empty((n_points, embedding_dimension), dtype=np.float32)
+        self._D = np.empty((n_points, n_points), dtype=np.float32)
+        self._head = 0
+        self._rolling = False
+
+        # Norms cached per window, keyed on the raw float32 bytes of the window
+        self._cached_norm = functools.lru_cache(maxsize=NORM_CACHE_SIZE)(self._norm_from_bytes)
+
+        # max_workers=0: no executor, every window runs inline (used inside pool workers)
+        if not max_workers:
+            self.executor = None
+            self.run_inline = True
+            return
 
-        self.landscape = PersistenceLandscape(
-            n_layers=1,
-            n_bins=100
+        # Process pool for expensive windows: keeps ripser's CPU time and allocator off the event
+        # loop's process (no GIL or heap contention), optionally pinned to isolated cpu_cores.
+        # Raise max_workers when several symbols share one engine so they compute in parallel.
+        # Workers are spawned on first use, not forked from the running loop's threads.
+        self.executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(cpu_cores, dict(
+                window_size=window_size, embedding_dimension=embedding_dimension, time_delay=time_delay,
+                n_threads=n_threads, normalize=normalize, h0_only=h0_only
+            ))
         )
 
-        # Thread pool to avoid blocking the async event loop
-        self.executor = ThreadPoolExecutor(max_workers=1)
+        # Measured once: small windows are computed inline instead of through the executor
+        cost = self._time_window()
+        self.run_inline = cost < INLINE_MAX_SECONDS
+        logger.info(f"TDA window cost: {cost * 1000:.2f} ms ({'inline' if self.run_inline else 'executor'})")
 
     async def compute_landscape_norm(self, price_series: list[float]) -> float:
         """
@@ -47,38 +168,117 @@ class TDAEngine:
             return 0.0
 
         # Extract recent window
-        window = np.array(price_series[-self.window_size:])
+        # float32 end to end: ample for price-scale distances, which ripser stores as float32
+        # anyway, and half the memory traffic for the distance matrix
+        window = np.ascontiguousarray(price_series[-self.window_size:], dtype=np.float32)
+        key = window.tobytes()
 
         try:
-            # Offload heavy computation to thread
+            if self.run_inline:
+                return self._cached_norm(key)
+
+            # Offload heavy computation to a worker process
             norm = await asyncio.get_running_loop().run_in_executor(
                 self.executor,
-                self._compute_norm_sync,
-                window
+                _worker_norm,
+                key
             )
             return norm
         except Exception as e:
             logger.error(f"TDA Computation failed: {e}")
             return 0.0
 
-    def _compute_norm_sync(self, window: np.ndarray) -> float:
-        # 1. Takens Embedding
-        # gtda expects (n_samples, sequence_length)
-        X = window.reshape(1, -1)
+    async def compute_landscape_norms(self, price_series_batch: list[list[float]]) -> list[float]:
+        """
+        compute_landscape_norm for several series at once (e.g. one per screened symbol).
+        Executor-bound windows are all submitted together, so they compute in parallel
+        across max_workers instead of waiting on one another.
+        """
+        if self.run_inline:
+            return [await self.compute_landscape_norm(s) for s in price_series_batch]
+        return list(await asyncio.gather(*map(self.compute_landscape_norm, price_series_batch)))
+
+    def _norm_from_bytes(self, key: bytes) -> float:
+        return self._compute_norm_sync(np.frombuffer(key, dtype=np.float32))
+
+    def _time_window(self, repeats=3) -> float:
+        """Best-of-`repeats` seconds for a full _compute_norm_sync call on a synthetic random-walk window."""
+        window = 1000 + np.cumsum(np.random.default_rng(0).standard_normal(self.window_size, dtype=np.float32))
+        self._compute_norm_sync(window) # Warm-up
+        best = float("inf")
+        for _ in range(repeats):
+            self._rolling = False # Time the full (non-rolling) path
+            start = time.perf_counter()
+            self._compute_norm_sync(window)
+            best = min(best, time.perf_counter() - start)
+        return best
 
-        # Point Cloud: (1, n_points_in_cloud, dimension)
-        point_cloud = self.embedder.fit_transform(X)
+    def _shift_from_last(self, window: np.ndarray) -> int:
+        """
+        k if `window` is the last window advanced by k samples, else -1. k stays below the
+        point count (and at most window_size // 2) so at least one point carries over.
+        """
+        if not self._rolling:
+            return -1
+        last = self._last_window
+        max_shift = min(self.window_size // 2, len(self._points) - 1)
+        # Only offsets where the window's first price lines up need a full compare
+        for k in np.flatnonzero(last[:max_shift + 1] == window[0]).tolist():
+            if np.array_equal(window[:self.window_size - k], last[k:]):
+                return k
+        return -1
+
+    def _distances(self, window: np.ndarray) -> np.ndarray:
+        """Distance matrix of the window's Takens point cloud, rolled forward from the last one when possible."""
+        # Point i is (x[i], x[i + delay], ..., x[i + (dimension - 1) * delay]): a strided view
+        # of the window, no copy. Point Cloud: (n_points_in_cloud, dimension)
+        span = (self.embedding_dimension - 1) * self.time_delay + 1
+        point_cloud = np.lib.stride_tricks.sliding_window_view(window, span)[:, ::self.time_delay]
+
+        n = len(point_cloud)
+        k = self._shift_from_last(window)
+        if not 0 <= k < n:
+            np.copyto(self._points, point_cloud)
+            _distance_matrix(self._points, out=self._D)
+            self._head = 0
+        elif k:
+            # The k newest points take the ring slots of the k oldest. Vertex order does not
+            # change the persistence diagram, so no other row or column has to move.
+            slots = (self._head + np.arange(k)) % n
+            self._points[slots] = point_cloud[n - k:]
+            rows = np.sqrt(np.square(self._points[slots, np.newaxis] - self._points).sum(axis=2))
+            self._D[slots] = rows
+            self._D[:, slots] = rows.T
+            self._head = (self._head + k) % n
+        np.copyto(self._last_window, window)
+        self._rolling = True
+        return self._D
+
+    def _compute_norm_sync(self, window: np.ndarray) -> float:
+        # 1. Takens Embedding and its distance matrix
+        D = self._distances(window)
 
-        # 2. Persistence Diagram
-        # Returns (1, n_features, 3)
-        diagrams = self.persistence.fit_transform(point_cloud)
+        if self.max_homology_dim == 0:
+            # 2-3. Components only: the norm follows from the MST, no diagram needed
+            l1_norm = _h0_landscape_l1(D)
+        else:
+            # 2. Persistence Diagram
+            # ripser directly on a precomputed distance matrix (no gtda wrapper validation/padding
+            # of a batch, no sklearn pairwise_distances): [H0, H1] arrays of (birth, death)
+            dgms = ripser_parallel(
+                D, maxdim=self.max_homology_dim, metric='precomputed', n_threads=self.n_threads
+            )['dgms']
 
-        # 3. Persistence Landscape
-        # Returns (1, n_layers * n_bins * n_homology_dims)
-        landscapes = self.landscape.fit_transform(diagrams)
+            # 3. L1 Norm of the first Persistence Landscape, summed over homology dimensions
+            # Integrated in closed form from the bars: no landscape rasterized onto a bin grid
+            l1_norm = sum(_landscape_l1(dgm) for dgm in dgms)
 
-        # 4. L1 Norm
-        # Sum of absolute values of the landscape vector
-        l1_norm = np.sum(np.abs(landscapes))
+        if self.normalize:
+            # z-normalizing shifts (distances ignore it) and scales every distance, hence every
+            # bar, by 1 / std; the landscape integral scales by its square and the bin span by
+            # 1 / std, so the norm scales by 1 / std. The window is never rewritten: one std
+            # pass rescales the raw norm.
+            std = float(window.std())
+            l1_norm /= std + 1e-12
 
-        return float(l1_norm)
+        return l1_norm
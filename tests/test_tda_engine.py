@@ -0,0 +1,125 @@
+import asyncio
+
+import numpy as np
+import pytest
+from gph import ripser_parallel
+
+from src.strategy import HybridStrategy
+from src.tda_engine import LANDSCAPE_BINS, TDAEngine, _distance_matrix, _landscape_l1
+
+# The norm is compared against the regime thresholds, so the checks below pin its scale too
+_STRATEGY = HybridStrategy(tda_engine=None, mc_engine=None)
+
+
+def _regime(norm: float) -> str:
+    if norm > _STRATEGY.THRESHOLD_CRASH:
+        return "CRASH_RISK"
+    if norm < _STRATEGY.THRESHOLD_STABLE:
+        return "STABLE_TREND"
+    return "NEUTRAL"
+
+
+def _rasterized_l1(dgm: np.ndarray, n_bins: int = LANDSCAPE_BINS) -> float:
+    """
+    Sum of the first landscape sampled on n_bins points over [min birth, max death], rescaled to
+    LANDSCAPE_BINS samples: the gtda PersistenceLandscape(n_bins=100) + sum the thresholds were set on.
+    """
+    dgm = dgm[np.isfinite(dgm[:, 1]) & (dgm[:, 1] > dgm[:, 0])]
+    if not len(dgm):
+        return 0.0
+    t = np.linspace(dgm[:, 0].min(), dgm[:, 1].max(), n_bins)[:, np.newaxis]
+    tents = np.maximum(np.minimum(t - dgm[:, 0], dgm[:, 1] - t), 0.0)
+    return float(tents.max(axis=1).sum()) * (LANDSCAPE_BINS - 1) / (n_bins - 1)
+
+
+def _windows(n_windows: int, window_size: int = 50, seed: int = 0) -> list[np.ndarray]:
+    """Tick-quantized random walks across volatilities: ties give duplicate points and equal distances."""
+    rng = np.random.default_rng(seed)
+    windows = []
+    for i in range(n_windows):
+        vol = (0.0005, 0.001, 0.003, 0.01, 0.03)[i % 5]
+        tick = (5, 10, 25)[i % 3]
+        walk = 4500 * np.exp(np.cumsum(rng.normal(0, vol, window_size)))
+        windows.append((np.round(walk / tick) * tick).astype(np.float32))
+    return windows
+
+
+def _sorted_rows(points: np.ndarray) -> np.ndarray:
+    return points[np.lexsort(points.T[::-1])]
+
+
+def _norm(engine: TDAEngine, window: np.ndarray) -> float:
+    return asyncio.run(engine.compute_landscape_norm(list(window)))
+
+
+def _reference_norm(window: np.ndarray, embedding_dimension=3, time_delay=1) -> float:
+    """Float64 Takens embedding, ripser on the point cloud and a 100-bin rasterized landscape per dimension."""
+    span = (embedding_dimension - 1) * time_delay + 1
+    points = np.lib.stride_tricks.sliding_window_view(window.astype(np.float64), span)[:, ::time_delay]
+    dgms = ripser_parallel(points, maxdim=1)['dgms']
+    return sum(_rasterized_l1(dgm) for dgm in dgms)
+
+
+def test_landscape_l1_matches_fine_rasterization():
+    rng = np.random.default_rng(3)
+    for _ in range(200):
+        n = int(rng.integers(1, 30))
+        births = rng.uniform(0, 10, n).round(int(rng.integers(0, 3)))
+        deaths = births + rng.exponential(2, n).round(int(rng.integers(0, 3))) + 0.01
+        dgm = np.column_stack((births, deaths))
+        exact = _landscape_l1(np.vstack((dgm, [[0.0, np.inf]])))
+        assert exact == pytest.approx(_rasterized_l1(dgm, n_bins=100_001), rel=1e-4)
+
+
+def test_landscape_l1_empty_diagram():
+    assert _landscape_l1(np.empty((0, 2))) == 0.0
+    assert _landscape_l1(np.array([[0.0, np.inf]])) == 0.0
+
+
+def test_norm_matches_binned_landscape_and_keeps_regimes():
+    engine = TDAEngine(max_workers=0)
+    for window in _windows(60):
+        ref = _reference_norm(window)
+        norm = _norm(engine, window)
+        assert norm == pytest.approx(ref, rel=1e-2, abs=1e-6)
+        assert _regime(norm) == _regime(ref)
+
+
+def test_h0_norm_matches_ripser_h0():
+    engine = TDAEngine(max_workers=0, h0_only=True)
+    for window in _windows(30, seed=1):
+        span = engine.embedding_dimension
+        points = np.lib.stride_tricks.sliding_window_view(window, span)
+        h0 = ripser_parallel(_distance_matrix(points), maxdim=0, metric='precomputed')['dgms'][0]
+        assert _norm(engine, window) == pytest.approx(_landscape_l1(h0), rel=1e-5, abs=1e-6)
+
+
+def test_normalized_norm_matches_z_normalized_window():
+    raw = TDAEngine(max_workers=0)
+    normalized = TDAEngine(max_workers=0, normalize=True)
+    for window in _windows(30, seed=2):
+        z = (window - window.mean()) / window.std()
+        assert _norm(normalized, window) == pytest.approx(_norm(raw, z), rel=1e-2, abs=1e-6)
+
+
+@pytest.mark.parametrize("embedding_dimension,time_delay", [(3, 1), (5, 7), (2, 3)])
+def test_rolling_distances_match_fresh(embedding_dimension, time_delay):
+    window_size = 50
+    rolling = TDAEngine(window_size, embedding_dimension, time_delay, max_workers=0)
+    rng = np.random.default_rng(4)
+    series = np.round(4500 + np.cumsum(rng.normal(0, 10, 2000)) / 5) * 5
+    start = 0
+    for _ in range(60):
+        # Shifts up to and past both window_size // 2 and the Takens point count
+        start += int(rng.integers(0, window_size))
+        window = series[start:start + window_size].astype(np.float32)
+        D = rolling._distances(window)
+
+        fresh = TDAEngine(window_size, embedding_dimension, time_delay, max_workers=0)
+        fresh._distances(window)
+        # Same point cloud (in ring order) and the same distances between its points
+        assert np.array_equal(_sorted_rows(rolling._points), _sorted_rows(fresh._points))
+        np.testing.assert_allclose(D, _distance_matrix(rolling._points), rtol=1e-5, atol=1e-2)
+        assert rolling._compute_norm_sync(window) == pytest.approx(
+            fresh._compute_norm_sync(window), rel=1e-4, abs=1e-6
+        )